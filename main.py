@@ -1,21 +1,66 @@
+import asyncio
+import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.conf.config import config
+from src.database.db import get_db, sessionmanager
+from src.repository import users as repository_users
 from src.routes import images, auth, users, comments, transform
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+THREAD_POOL_WORKERS = 32
 
-origins = ["*"]
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Application lifespan: route log records through a queue so handlers never block the event loop,
+    size the default executor used by ``asyncio.to_thread`` for Cloudinary calls and pre-warm the
+    database connection pool together with the per-request user lookups.
+
+    :param _app: The FastAPI application.
+    :type _app: FastAPI
+    """
+    executor = ThreadPoolExecutor(max_workers=THREAD_POOL_WORKERS)
+    asyncio.get_running_loop().set_default_executor(executor)
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    listener = QueueListener(log_queue, logging.StreamHandler(), respect_handler_level=True)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(queue_handler)
+    listener.start()
+    try:
+        await sessionmanager.warm_up(*repository_users.WARM_UP_STATEMENTS)
+    except Exception:
+        logger.warning("Could not pre-warm the database connection pool", exc_info=True)
+    try:
+        yield
+    finally:
+        listener.stop()
+        root_logger.removeHandler(queue_handler)
+        executor.shutdown(wait=False)
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
+    allow_origins=config.CORS_ORIGINS,
+    allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=600,
 )
 
 app.include_router(auth.router, prefix="/api")
@@ -24,12 +69,18 @@ app.include_router(images.router, prefix="/api")
 app.include_router(comments.router, prefix="/api")
 app.include_router(transform.router, prefix="/api")
 
+HEALTHCHECK_TTL = 5
+_last_ok: float = float('-inf')
+
 
 @app.get("/api/healthchecker")
 async def healthchecker(db: AsyncSession = Depends(get_db)):
     """
     Endpoint to check the health of the FastAPI application and the database.
 
+    A successful database probe is reused for ``HEALTHCHECK_TTL`` seconds, so frequent
+    load balancer checks do not issue a query on every call.
+
     :param db: The active AsyncSession to perform the database health check.
     :type db: AsyncSession
     :return: A dictionary containing a welcome message if the database is configured correctly.
@@ -37,12 +88,16 @@ async def healthchecker(db: AsyncSession = Depends(get_db)):
     :raises HTTPException 500: If there is an error connecting to the database
         or if the database is not configured correctly.
     """
+    global _last_ok
+    if time.monotonic() - _last_ok < HEALTHCHECK_TTL:
+        return {"message": "Welcome to FastAPI!"}
     try:
         result = await db.execute(text("SELECT 1"))
         result = result.fetchone()
         if result is None:
             raise HTTPException(status_code=500, detail="Database is not configured correctly")
+        _last_ok = time.monotonic()
         return {"message": "Welcome to FastAPI!"}
-    except Exception as e:
-        print(e)
+    except Exception:
+        logger.exception("Database healthcheck failed")
         raise HTTPException(status_code=500, detail="Error connecting to the database")
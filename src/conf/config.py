@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
 
@@ -10,8 +12,23 @@ class Settings(BaseSettings):
     CLD_NAME: str = 'cloud_name'
     CLD_API_KEY: int = 00000000
     CLD_API_SECRET: str = 'api_secret'
+    REDIS_HOST: str = 'localhost'
+    REDIS_PORT: int = 6379
+    REDIS_PASSWORD: str | None = None
+    CORS_ORIGINS: list[str] = ['*']
 
     model_config = ConfigDict(extra='ignore', env_file=".env", env_file_encoding="utf-8")  # noqa
 
 
-config = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Build the application settings once and reuse them for every later call.
+
+    :return: The application settings.
+    :rtype: Settings
+    """
+    return Settings()
+
+
+config = get_settings()
@@ -1,3 +1,4 @@
+import asyncio
 import contextlib
 from typing import AsyncGenerator
 
@@ -15,13 +16,44 @@ class DatabaseSessionManager:
     """
 
     def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
+        self._engine: AsyncEngine | None = create_async_engine(
+            url,
+            pool_size=20,
+            max_overflow=40,
+            pool_timeout=30,
+            pool_recycle=1800,
+            pool_pre_ping=True,
+            echo=False,
+            query_cache_size=1200,
+            connect_args={
+                "prepared_statement_cache_size": 512,
+                "statement_cache_size": 512,
+            },
+        )
         self._session_maker: async_sessionmaker = async_sessionmaker(
             autoflush=False,
             autocommit=False,
+            expire_on_commit=False,
             bind=self._engine,
         )
 
+    async def warm_up(self, *statements):
+        """
+        Open ``pool_size`` connections at once and return them to the pool, so the first requests
+        do not pay for connection setup.
+
+        Each connection runs the given statements once, which fills SQLAlchemy's compiled cache and
+        every connection's prepared statement cache for the hot queries.
+
+        :param statements: Statements to be executed on every connection.
+        """
+        async def connect():
+            async with self._session_maker() as session:
+                for statement in statements:
+                    await session.execute(statement)
+
+        await asyncio.gather(*(connect() for _ in range(self._engine.pool.size())))
+
     @contextlib.asynccontextmanager
     async def session(self):
         """
@@ -36,9 +68,9 @@ class DatabaseSessionManager:
         session = self._session_maker()
         try:
             yield session
-        except Exception as err:
-            print(err)
+        except Exception:
             await session.rollback()
+            raise
         finally:
             await session.close()
 
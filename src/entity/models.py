@@ -2,7 +2,7 @@ import enum
 from datetime import date
 from typing import List, Optional
 
-from sqlalchemy import String, ForeignKey, DateTime, func, Enum, Integer, Table, Column
+from sqlalchemy import String, ForeignKey, DateTime, func, Enum, Integer, Table, Column, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship
 
 
@@ -15,9 +15,9 @@ class TimeStampMixin:
     """Mixin class providing timestamp information (created_at, updated_at) for SQLAlchemy models."""
     id: Mapped[int] = mapped_column(primary_key=True)
     created_at: Mapped[date] = mapped_column(
-        'created_at', DateTime, default=func.now(), nullable=True)
+        'created_at', DateTime, default=func.now(), server_default=func.now(), nullable=True)
     updated_at: Mapped[date] = mapped_column(
-        'updated_at', DateTime, default=func.now(), onupdate=func.now(), nullable=True)
+        'updated_at', DateTime, default=func.now(), server_default=func.now(), onupdate=func.now(), nullable=True)
 
 
 picture_tag_association = Table(
@@ -31,17 +31,23 @@ picture_tag_association = Table(
 class Picture(TimeStampMixin, Base):
     """SQLAlchemy model representing the 'pictures' table in the database."""
     __tablename__ = 'pictures'
+    __table_args__ = (
+        Index('ix_pictures_user_id_id', 'user_id', 'id'),
+        Index('uq_pictures_cloudinary_public_id', 'cloudinary_public_id', unique=True),
+        Index('ix_pictures_user_id_content_sha256', 'user_id', 'content_sha256'),
+    )
     url: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(String(255), nullable=True, default=None)
     cloudinary_public_id: Mapped[str] = mapped_column(String, nullable=False)
+    content_sha256: Mapped[str] = mapped_column(String(64), nullable=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
 
     transformed_pictures: Mapped["TransformedPicture"] = relationship(
-        "TransformedPicture", back_populates="original_picture", lazy='joined')
+        "TransformedPicture", back_populates="original_picture")
     user: Mapped["User"] = relationship("User", back_populates="pictures", lazy='joined')
-    comment: Mapped[List["Comment"]] = relationship(back_populates="picture", cascade='all, delete', lazy='joined')
+    comment: Mapped[List["Comment"]] = relationship(back_populates="picture", cascade='all, delete')
     tags: Mapped[List["Tag"]] = relationship(
-        secondary=picture_tag_association, back_populates='pictures', lazy='joined')
+        secondary=picture_tag_association, back_populates='pictures')
 
 
 class Tag(TimeStampMixin, Base):
@@ -50,12 +56,17 @@ class Tag(TimeStampMixin, Base):
     name: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
 
     pictures: Mapped[List["Picture"]] = relationship(
-        secondary=picture_tag_association, back_populates='tags', lazy='joined')
+        secondary=picture_tag_association, back_populates='tags')
 
 
 class TransformedPicture(TimeStampMixin, Base):
     """SQLAlchemy model representing the 'transformed_pictures' table in the database."""
     __tablename__ = 'transformed_pictures'
+    __table_args__ = (
+        Index('ix_transformed_pictures_original_picture_id', 'original_picture_id'),
+        Index('ix_transformed_pictures_user_id_id', 'user_id', 'id'),
+    )
+    __mapper_args__ = {'eager_defaults': True}
     original_picture_id: Mapped[int] = mapped_column(ForeignKey('pictures.id'), nullable=False)
     url: Mapped[str] = mapped_column(String(255), nullable=False)
     public_id: Mapped[str] = mapped_column(String, nullable=False)  # cloudinary public id
@@ -76,34 +87,42 @@ class Role(enum.Enum):
 class User(TimeStampMixin, Base):
     """SQLAlchemy model representing the 'users' table in the database."""
     __tablename__ = "users"
-    full_name: Mapped[str] = mapped_column(String(50))
+    __table_args__ = (
+        Index('uq_users_email_lower', func.lower(text('email')), unique=True),
+    )
+    full_name: Mapped[str] = mapped_column(String(50), unique=True)
     email: Mapped[str] = mapped_column(String(150), nullable=False, unique=True)
     password: Mapped[str] = mapped_column(String(255), nullable=False)
     avatar: Mapped[str] = mapped_column(String(255), nullable=True)
-    refresh_token: Mapped[str] = mapped_column(String(255), nullable=True)
     role: Mapped[Enum] = mapped_column("role", Enum(Role), default=Role.user, nullable=True)
     ban: Mapped[bool] = mapped_column(default=False, nullable=True)
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
     picture_count: Mapped[Optional[int]] = mapped_column(
         Integer, nullable=True)
 
     pictures: Mapped["Picture"] = relationship(
-        "Picture", back_populates="user", uselist=True, lazy='joined', cascade='all, delete')
-    blacklisted_tokens: Mapped["Blacklisted"] = relationship("Blacklisted", back_populates="user", lazy='joined')
-    comment: Mapped["Comment"] = relationship("Comment", back_populates="user", lazy='joined', cascade='all, delete')
+        "Picture", back_populates="user", uselist=True, cascade='all, delete')
+    comment: Mapped["Comment"] = relationship("Comment", back_populates="user", cascade='all, delete')
+    auth: Mapped["UserAuth"] = relationship(
+        "UserAuth", back_populates="user", uselist=False, lazy='noload', cascade='all, delete')
 
 
-class Blacklisted(TimeStampMixin, Base):
-    """SQLAlchemy model representing the 'blacklisted' table in the database."""
-    __tablename__ = "blacklisted"
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)
-    token: Mapped[str] = mapped_column(String(255), nullable=True)
+class UserAuth(Base):
+    """SQLAlchemy model representing the 'user_auth' table with rarely read user credentials."""
+    __tablename__ = "user_auth"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    refresh_token: Mapped[str] = mapped_column(String(255), nullable=True)
 
-    user = relationship("User", back_populates="blacklisted_tokens")
+    user = relationship("User", back_populates="auth")
 
 
 class Comment(TimeStampMixin, Base):
     """SQLAlchemy model representing the 'comments' table in the database."""
     __tablename__ = "comments"
+    __table_args__ = (
+        Index('ix_comments_picture_id_id', 'picture_id', 'id'),
+        Index('ix_comments_user_id', 'user_id'),
+    )
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
     picture_id: Mapped[int] = mapped_column(Integer, ForeignKey(Picture.id), nullable=False)
     text: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -1,8 +1,58 @@
-from sqlalchemy import select
+import asyncio
+
+import orjson
+from sqlalchemy import select, insert, update, delete, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.entity.models import Comment, User, Picture
-from src.schemas.comment import CommentSchema
+from src.entity.models import Comment, User
+from src.schemas.comment import CommentSchema, CommentResponse
+from src.services.cache import cache_get, cache_set, cache_delete, cache_incr
+
+COMMENTS_CACHE_TTL = 60
+COMMENT_CACHE_TTL = 300
+
+_GET_COMMENT_STMT = select(Comment).where(Comment.id == bindparam('comment_id'))
+_LIST_COMMENTS_STMT = (
+    select(Comment.id, Comment.text, Comment.user_id, Comment.created_at)
+    .where(Comment.picture_id == bindparam('picture_id'))
+    .order_by(Comment.id)
+    .offset(bindparam('offset'))
+    .limit(bindparam('limit'))
+)
+_LIST_COMMENTS_AFTER_STMT = (
+    select(Comment.id, Comment.text, Comment.user_id, Comment.created_at)
+    .where(Comment.picture_id == bindparam('picture_id'), Comment.id > bindparam('after_id'))
+    .order_by(Comment.id)
+    .limit(bindparam('limit'))
+)
+
+
+def _comment_to_dict(comment: Comment) -> dict:
+    """
+    Convert a comment to a plain dictionary that can be cached.
+
+    :param comment: The comment to be converted.
+    :type comment: Comment
+    :return: The comment fields.
+    :rtype: dict
+    """
+    return CommentResponse.model_validate(comment, from_attributes=True).model_dump()
+
+
+async def _invalidate_comments(picture_id: int, comment_id: int | None = None):
+    """
+    Invalidate the cached comment pages and the cached picture, and optionally a single cached comment.
+
+    Pages are cached under a per-picture version number, so bumping it makes every cached page stale at once.
+    The version bump and the key removal are sent to Redis concurrently.
+
+    :param picture_id: The ID of the picture whose comment pages are invalidated.
+    :type picture_id: int
+    :param comment_id: The ID of the comment to be removed from the cache.
+    :type comment_id: int | None
+    """
+    keys = [f'pic:{picture_id}'] if comment_id is None else [f'comment:{comment_id}', f'pic:{picture_id}']
+    await asyncio.gather(cache_incr(f'comments:{picture_id}:version'), cache_delete(*keys))
 
 
 async def create_comment(body: CommentSchema, picture_id: int, db: AsyncSession, user: User):
@@ -23,14 +73,40 @@ async def create_comment(body: CommentSchema, picture_id: int, db: AsyncSession,
     comment = Comment(**body.model_dump(exclude_unset=True), user_id=user.id, picture_id=picture_id)
     db.add(comment)
     await db.commit()
-    await db.refresh(comment)
+    await _invalidate_comments(picture_id)
     return comment
 
 
-async def get_comments(picture_id: int, offset: int, limit: int, db: AsyncSession):
+async def create_comments(bodies: list[CommentSchema], picture_id: int, db: AsyncSession, user: User):
+    """
+    Create several comments on a picture with a single batched INSERT.
+
+    :param bodies: The schemas representing the comments data.
+    :type bodies: list[CommentSchema]
+    :param picture_id: The ID of the picture associated with the comments.
+    :type picture_id: int
+    :param db: The asynchronous database session.
+    :type db: AsyncSession
+    :param user: The user creating the comments.
+    :type user: User
+    :return: The created comments.
+    :rtype: List[Comment]
+    """
+    rows = [{'text': body.text, 'user_id': user.id, 'picture_id': picture_id} for body in bodies]
+    comments = await db.scalars(insert(Comment).returning(Comment), rows)
+    comments = comments.all()
+    await db.commit()
+    await _invalidate_comments(picture_id)
+    return comments
+
+
+async def get_comments(picture_id: int, offset: int, limit: int, db: AsyncSession, after_id: int | None = None):
     """
     Retrieve a list of comments for a specific picture from the database.
 
+    When ``after_id`` is given, comments are paginated by key (only comments with a greater ID are returned)
+    and ``offset`` is ignored.
+
     :param picture_id: The ID of the picture for which comments are retrieved.
     :type picture_id: int
     :param offset: The offset for pagination.
@@ -39,16 +115,27 @@ async def get_comments(picture_id: int, offset: int, limit: int, db: AsyncSessio
     :type limit: int
     :param db: The asynchronous database session.
     :type db: AsyncSession
-    :return: A list of comments.
-    :rtype: List[Comment]
+    :param after_id: The ID of the last comment of the previous page.
+    :type after_id: int | None
+    :return: A list of comment fields (id, text, user_id, created_at), empty if the picture has none
+        or does not exist.
+    :rtype: List[dict]
     """
-    stmt = select(Picture).where(Picture.id == picture_id)
-    picture = await db.execute(stmt)
-    picture = picture.unique().scalar_one_or_none()
-    if picture:
-        smtp = select(Comment).filter_by(picture_id=picture_id).offset(offset).limit(limit)
-        comments = await db.execute(smtp)
-        return comments.scalars().all()
+    version = await cache_get(f'comments:{picture_id}:version') or b'0'
+    cache_key = f'comments:{picture_id}:{version.decode()}:{offset}:{limit}:{after_id}'
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return orjson.loads(cached)
+
+    if after_id is not None:
+        comments = await db.execute(
+            _LIST_COMMENTS_AFTER_STMT, {'picture_id': picture_id, 'after_id': after_id, 'limit': limit})
+    else:
+        comments = await db.execute(
+            _LIST_COMMENTS_STMT, {'picture_id': picture_id, 'offset': offset, 'limit': limit})
+    comments = [dict(row) for row in comments.mappings()]
+    await cache_set(cache_key, orjson.dumps(comments), COMMENTS_CACHE_TTL)
+    return comments
 
 
 async def get_comment(comment_id: int, db: AsyncSession):
@@ -62,9 +149,15 @@ async def get_comment(comment_id: int, db: AsyncSession):
     :return: The retrieved comment or None if not found.
     :rtype: Optional[Comment]
     """
-    smtp = select(Comment).filter_by(id=comment_id)
-    comment = await db.execute(smtp)
-    return comment.scalar_one_or_none()
+    cached = await cache_get(f'comment:{comment_id}')
+    if cached is not None:
+        return orjson.loads(cached)
+
+    comment = await db.execute(_GET_COMMENT_STMT, {'comment_id': comment_id})
+    comment = comment.scalar_one_or_none()
+    if comment:
+        await cache_set(f'comment:{comment_id}', orjson.dumps(_comment_to_dict(comment)), COMMENT_CACHE_TTL)
+    return comment
 
 
 async def update_comment(comment_id: int, body: CommentSchema, db: AsyncSession, user: User):
@@ -82,13 +175,17 @@ async def update_comment(comment_id: int, body: CommentSchema, db: AsyncSession,
     :return: The updated comment or None if not found.
     :rtype: Optional[Comment]
     """
-    stmt = select(Comment).filter_by(id=comment_id, user_id=user.id)
+    stmt = (
+        update(Comment)
+        .where(Comment.id == comment_id, Comment.user_id == user.id)
+        .values(text=body.text)
+        .returning(Comment)
+    )
     comment = await db.execute(stmt)
     comment = comment.scalar_one_or_none()
+    await db.commit()
     if comment:
-        comment.text = body.text
-        await db.commit()
-        await db.refresh(comment)
+        await _invalidate_comments(comment.picture_id, comment.id)
     return comment
 
 
@@ -103,10 +200,10 @@ async def delete_comment(comment_id: int, db: AsyncSession):
     :return: The deleted comment or None if not found.
     :rtype: Optional[Comment]
     """
-    stmt = select(Comment).filter_by(id=comment_id)
+    stmt = delete(Comment).where(Comment.id == comment_id).returning(Comment)
     comment = await db.execute(stmt)
     comment = comment.scalar_one_or_none()
+    await db.commit()
     if comment:
-        await db.delete(comment)
-        await db.commit()
+        await _invalidate_comments(comment.picture_id, comment.id)
     return comment
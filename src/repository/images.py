@@ -1,14 +1,44 @@
+import asyncio
+import hashlib
+import logging
+
+import orjson
 from fastapi import UploadFile, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from src.entity.models import Picture, User, Role
+from src.entity.models import Picture, User, Role, Tag, Comment, TransformedPicture, picture_tag_association
 from src.repository import tags as repository_tags
 from src.schemas.images import PictureSchema, PictureUpdateSchema
+from src.services.cache import cache_get, cache_set, cache_delete, cache_incr
 from src.services.cloudstore import CloudService
 
-
-async def access_check(user: User, picture_user_id, role):
+logger = logging.getLogger(__name__)
+
+PICTURE_CACHE_TTL = 600
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_GET_PICTURE_STMT = select(
+    Picture.user_id,
+    Picture.id.label('picture_id'),
+    Picture.url,
+    Picture.description,
+    select(func.array_agg(aggregate_order_by(Tag.name, Tag.id)))
+    .join(picture_tag_association, picture_tag_association.c.tag_id == Tag.id)
+    .where(picture_tag_association.c.picture_id == Picture.id)
+    .scalar_subquery()
+    .label('tags'),
+    Picture.created_at,
+    select(func.array_agg(aggregate_order_by(Comment.text, Comment.id)))
+    .where(Comment.picture_id == Picture.id)
+    .scalar_subquery()
+    .label('comments'),
+).where(Picture.id == bindparam('picture_id'))
+
+
+def access_check(user: User, picture_user_id, role):
     """
     Check if the user has access rights to a specific picture based on user ID and role.
 
@@ -24,10 +54,46 @@ async def access_check(user: User, picture_user_id, role):
     return user.id == picture_user_id or role == Role.admin
 
 
+def _sha256(file) -> str:
+    """
+    Hash a file object chunk by chunk and rewind it for the upload.
+
+    :param file: Binary file object.
+    :type file: BinaryIO
+    :return: Hex digest of the file content.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+async def _prepare_tags(tags: list[str], db: AsyncSession):
+    """
+    Create the tags of a new picture and commit them, so the session hands its connection back to the pool
+    while the Cloudinary upload is still in flight.
+
+    :param tags: The names of the tags.
+    :type tags: list[str]
+    :param db: The asynchronous database session.
+    :type db: AsyncSession
+    :return: The created or retrieved tags.
+    :rtype: list[Tag]
+    """
+    prepared_tags = await repository_tags.get_or_create_tags(tags, db)
+    await db.commit()
+    return prepared_tags
+
+
 async def upload_picture(file: UploadFile, body: PictureSchema, db: AsyncSession, user: User):
     """
     Upload a new picture to the database.
 
+    If the user has already uploaded a file with the same content, nothing is stored or sent to Cloudinary and
+    a 409 naming the existing picture ID is raised, so the submitted description and tags are never silently lost.
+
     :param file: The file to be uploaded.
     :type file: UploadFile
     :param body: The schema representing the picture data.
@@ -37,48 +103,44 @@ async def upload_picture(file: UploadFile, body: PictureSchema, db: AsyncSession
     :param user: The user uploading the picture.
     :type user: User
     :return: Information about the uploaded picture.
-    :rtype: Dict[str, Union[int, str, List[str], datetime, List[str]]]
+    :rtype: Picture
     """
-    image = await CloudService.upload_picture(user.id, file)
-    prepared_tags = []
+    tags = list(dict.fromkeys(tag.strip() for tag in body.tags.split(',') if tag.strip())) if body.tags else []
+    if len(tags) > 5:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Максимальна кількість тегів - 5")
+
+    content_sha256 = await asyncio.to_thread(_sha256, file.file)
+    duplicate_id = await db.scalar(
+        select(Picture.id).where(Picture.user_id == user.id, Picture.content_sha256 == content_sha256).limit(1))
+    if duplicate_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f'Це зображення вже завантажено: {duplicate_id}')
+
+    image, prepared_tags = await asyncio.gather(
+        CloudService.upload_picture(user.id, file),
+        _prepare_tags(tags, db),
+        return_exceptions=True,
+    )
+    if isinstance(prepared_tags, BaseException):
+        if not isinstance(image, BaseException):
+            await CloudService.delete_picture(image[1])
+        raise prepared_tags
+    if isinstance(image, BaseException):
+        raise image
 
     if image:
         image_url, public_id = image
-        picture = Picture(url=image_url, description=body.description, cloudinary_public_id=public_id, user_id=user.id)
-
-        if body.tags:
-            tags = [tag.strip() for tag in body.tags.split(',')]
-            if len(tags) > 5:
-                await CloudService.delete_picture(public_id)
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Максимальна кількість тегів - 5")
-            for tag in tags:
-                result = await repository_tags.create_tag(tag, db)
-                prepared_tags.append(result)
-
-        for tag_name in prepared_tags:
-            picture.tags.append(tag_name)
+        picture = Picture(url=image_url, description=body.description, cloudinary_public_id=public_id, user_id=user.id,
+                          content_sha256=content_sha256, tags=prepared_tags, comment=[])
         db.add(picture)
         await db.commit()
-        await db.refresh(picture)
-
-    image_url, _ = image
-    stmt = select(Picture).where(Picture.url == image_url)
-    picture = await db.execute(stmt)
-    picture = picture.unique().scalar_one_or_none()
-    return {
-        'user_id': picture.user_id,
-        'picture_id': picture.id,
-        'url': picture.url,
-        'description': picture.description,
-        'tags': [tag.name for tag in picture.tags],
-        'created_at': picture.created_at,
-        'comments': picture.comment,
-    }
+
+    return picture
 
 
 async def delete_picture(picture_id: int, db: AsyncSession, user: User):
     """
-    Delete a specific picture from the database.
+    Delete a specific picture and its transformed pictures from the database and from Cloudinary.
 
     :param picture_id: The ID of the picture to delete.
     :type picture_id: int
@@ -89,18 +151,36 @@ async def delete_picture(picture_id: int, db: AsyncSession, user: User):
     :return: Success message.
     :rtype: str
     """
-    stmt = select(Picture).where(Picture.id == picture_id)
-    picture = await db.execute(stmt)
-    picture = picture.unique().scalar_one_or_none()
+    picture = await db.get(Picture, picture_id, options=[selectinload(Picture.tags), selectinload(Picture.comment)])
     if picture:
-        if not await access_check(user, picture.user_id, user.role):
+        if not access_check(user, picture.user_id, user.role):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail='Доступ заборонено: відсутні права на редагування'
             )
 
-        await CloudService.delete_picture(picture.cloudinary_public_id)
+        transforms = await db.execute(
+            delete(TransformedPicture).where(TransformedPicture.original_picture_id == picture_id).returning(
+                TransformedPicture.public_id, TransformedPicture.qr_public_id))
+        public_ids = [picture.cloudinary_public_id]
+        public_ids.extend(public_id for row in transforms.all() for public_id in row if public_id)
+        comment_keys = [f'comment:{comment.id}' for comment in picture.comment]
         await db.delete(picture)
         await db.commit()
+
+        # The assets are removed only once the rows pointing at them are gone.
+        if len(public_ids) > 1:
+            cloud_delete = CloudService.delete_pictures(public_ids)
+        else:
+            cloud_delete = CloudService.delete_picture(picture.cloudinary_public_id)
+        # The comments are deleted with the picture, so their cached pages and entries go too.
+        cloud_result, *_ = await asyncio.gather(
+            cloud_delete,
+            cache_incr(f'comments:{picture_id}:version'),
+            cache_delete(f'pic:{picture_id}', *comment_keys),
+            return_exceptions=True,
+        )
+        if isinstance(cloud_result, BaseException):
+            logger.error("Failed to delete %s from Cloudinary", public_ids, exc_info=cloud_result)
         return 'Success'
     return picture
 
@@ -118,29 +198,18 @@ async def update_picture_description(picture_id: int, body: PictureUpdateSchema,
    :param user: The user updating the picture.
    :type user: User
    :return: Information about the updated picture.
-   :rtype: Dict[str, Union[int, str, List[str], datetime, List[str]]]
+   :rtype: Picture
     """
-    stmt = select(Picture).where(Picture.id == picture_id)
-    picture = await db.execute(stmt)
-    picture = picture.unique().scalar_one_or_none()
+    picture = await db.get(Picture, picture_id, options=[selectinload(Picture.tags), selectinload(Picture.comment)])
     if picture:
-        if not await access_check(user, picture.user_id, user.role):
+        if not access_check(user, picture.user_id, user.role):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail='Доступ заборонено: відсутні права на редагування'
             )
 
         picture.description = body.description
         await db.commit()
-        await db.refresh(picture)
-        return {
-            'user_id': picture.user_id,
-            'picture_id': picture.id,
-            'url': picture.url,
-            'description': picture.description,
-            'tags': [tag.name for tag in picture.tags],
-            'created_at': picture.created_at,
-            'comments': [comment.text for comment in picture.comment],
-        }
+        await cache_delete(f'pic:{picture_id}')
     return picture
 
 
@@ -155,25 +224,28 @@ async def get_picture(picture_id: int, db: AsyncSession, user: User):
     :param user: The user requesting information about the picture.
     :type user: User
     :return: Information about the picture.
-    :rtype: Dict[str, Union[int, str, List[str], datetime, List[str]]]
+    :rtype: dict | None
     """
-    stmt = select(Picture).where(Picture.id == picture_id)
-    picture = await db.execute(stmt)
-    picture = picture.unique().scalar_one_or_none()
-    if picture:
-        if not await access_check(user, picture.user_id, user.role):
+    cached = await cache_get(f'pic:{picture_id}')
+    if cached:
+        picture = orjson.loads(cached)
+        if not access_check(user, picture['user_id'], user.role):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail='Доступ заборонено: відсутні права на редагування'
             )
-
-        result = {
-            'user_id': picture.user_id,
-            'picture_id': picture.id,
-            'url': picture.url,
-            'description': picture.description,
-            'tags': [tag.name for tag in picture.tags],
-            'created_at': picture.created_at,
-            'comments': [comment.text for comment in picture.comment],
-        }
-        return result
+        return picture
+
+    row = await db.execute(_GET_PICTURE_STMT, {'picture_id': picture_id})
+    row = row.mappings().one_or_none()
+    if row is None:
+        return None
+    if not access_check(user, row['user_id'], user.role):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail='Доступ заборонено: відсутні права на редагування'
+        )
+
+    picture = dict(row)
+    picture['tags'] = picture['tags'] or []
+    picture['comments'] = picture['comments'] or []
+    await cache_set(f'pic:{picture_id}', orjson.dumps(picture), PICTURE_CACHE_TTL)
     return picture
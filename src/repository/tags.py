@@ -1,27 +1,92 @@
-from sqlalchemy import select
+from collections import OrderedDict
+
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from src.entity.models import Tag
+from src.services.cache import cache_hmget, cache_hset
+
+TAG_IDS_CACHE_KEY = 'tags'
+TAG_ID_CACHE_SIZE = 4096
+
+_tag_ids: OrderedDict[str, int] = OrderedDict()
+
+
+def _remember_tag(tag: Tag):
+    """
+    Store a committed tag's ID in the in-process LRU cache.
+
+    :param tag: The tag to be remembered.
+    :type tag: Tag
+    """
+    _tag_ids[tag.name] = tag.id
+    _tag_ids.move_to_end(tag.name)
+    if len(_tag_ids) > TAG_ID_CACHE_SIZE:
+        _tag_ids.popitem(last=False)
+
+
+async def _known_tag(name: str, db: AsyncSession):
+    """
+    Attach a tag known to the in-process cache to the session without querying the database.
+
+    :param name: The name of the tag.
+    :type name: str
+    :param db: The asynchronous database session.
+    :type db: AsyncSession
+    :return: The tag or None if its ID is not cached.
+    :rtype: Tag | None
+    """
+    tag_id = _tag_ids.get(name)
+    if tag_id is None:
+        return None
+    _tag_ids.move_to_end(name)
+    tag = Tag(id=tag_id, name=name)
+    make_transient_to_detached(tag)
+    return await db.merge(tag, load=False)
 
 
-async def create_tag(tag: str, db: AsyncSession):
+async def get_or_create_tags(tags: list[str], db: AsyncSession):
     """
-    Create a new tag in the database or retrieve an existing tag with the specified name.
+    Create any missing tags with a single upsert and return all tags with the specified names.
 
-    :param tag: The name of the tag.
-    :type tag: str
+    Names are stripped, and empty and duplicate names are skipped.
+
+    :param tags: The names of the tags.
+    :type tags: list[str]
     :param db: The asynchronous database session.
     :type db: AsyncSession
-    :return: The created or retrieved tag.
-    :rtype: Tag
-   """
-    stmt = select(Tag).where(Tag.name == tag)
-    db_tag = await db.execute(stmt)
-    db_tag = db_tag.unique().scalar_one_or_none()
-    if db_tag:
-        return db_tag
-    db_tag = Tag(name=tag)
-    db.add(db_tag)
-    await db.commit()
-    await db.refresh(db_tag)
-    return db_tag
+    :return: The created or retrieved tags.
+    :rtype: list[Tag]
+    """
+    names = list(dict.fromkeys(name.strip() for name in tags if name.strip()))
+    known = [tag for tag in [await _known_tag(name, db) for name in names] if tag]
+    known_names = {tag.name for tag in known}
+    names = [name for name in names if name not in known_names]
+    if not names:
+        return known
+
+    cached_ids = await cache_hmget(TAG_IDS_CACHE_KEY, names)
+    ids = [int(tag_id) for tag_id in cached_ids if tag_id is not None]
+    uncached = [name for name, tag_id in zip(names, cached_ids) if tag_id is None]
+    result = await db.execute(select(Tag).where(or_(Tag.id.in_(ids), Tag.name.in_(uncached))))
+    found = [tag for tag in result.scalars().all() if tag.name in names]
+    for tag in found:
+        _remember_tag(tag)
+
+    found_names = {tag.name for tag in found}
+    missing = [name for name in names if name not in found_names]
+    if missing:
+        result = await db.execute(insert(Tag).values([{'name': name} for name in missing]).on_conflict_do_nothing(
+            index_elements=[Tag.name]).returning(Tag))
+        created = list(result.scalars().all())
+        if len(created) < len(missing):
+            result = await db.execute(select(Tag).where(Tag.name.in_(missing)))
+            created = list(result.scalars().all())
+        found.extend(created)
+
+    not_cached = set(uncached) | set(missing)
+    if not_cached:
+        await cache_hset(TAG_IDS_CACHE_KEY, {tag.name: tag.id for tag in found if tag.name in not_cached})
+    return known + found
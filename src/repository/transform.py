@@ -1,11 +1,37 @@
+import asyncio
+import functools
+import logging
+from io import BytesIO
+
 import qrcode
 from fastapi import HTTPException
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import raiseload
 
 from src.entity.models import TransformedPicture, Picture
 from src.services.cloudstore import CloudService
 
+logger = logging.getLogger(__name__)
+
+QR_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=QR_CACHE_SIZE)
+def _qr_png(url: str) -> bytes:
+    """
+    Render a QR code for the URL as PNG bytes, memoized per URL.
+
+    :param url: URL encoded in the QR code.
+    :type url: str
+    :return: PNG image bytes.
+    :rtype: bytes
+    """
+    buffer = BytesIO()
+    qrcode.make(url).save(buffer)
+    return buffer.getvalue()
+
 
 class TransformRepository:
     """
@@ -18,9 +44,24 @@ class TransformRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @staticmethod
+    async def _upload_qr(user_id: int, url: str):
+        """
+        Render a QR code for the URL in a worker thread and upload it to Cloudinary.
+
+        :param user_id: User ID associated with the QR code.
+        :type user_id: int
+        :param url: URL encoded in the QR code.
+        :type url: str
+        :return: Tuple containing the URL and public ID of the uploaded QR code.
+        :rtype: tuple
+        """
+        qr_png = await asyncio.to_thread(_qr_png, url)
+        return await CloudService.upload_qr_code(user_id, qr_png)
+
     async def create_transformed_picture(
             self, user_id: int,
-            original_picture_id: int,
+            original_picture: Picture,
             transformation_params: dict,
     ):
         """
@@ -28,54 +69,58 @@ class TransformRepository:
 
         :param user_id: User ID associated with the transformed picture.
         :type user_id: int
-        :param original_picture_id: ID of the original picture to be transformed.
-        :type original_picture_id: int
+        :param original_picture: The already loaded original picture to be transformed.
+        :type original_picture: Picture
         :param transformation_params: Dictionary containing transformation parameters.
         :type transformation_params: dict
         :return: The created TransformedPicture object or None if an exception occurs.
         :rtype: TransformedPicture or None
         """
-        original_picture = await self.get_picture_by_id(original_picture_id)
-        if not original_picture:
-            return None
+        uploaded_public_ids = []
         try:
             transformed_url, public_id = await CloudService.upload_transformed_picture(
                 user_id, original_picture.url, transformation_params)
-            qr_image = qrcode.make(transformed_url)
-            qr_url, qr_public_id = await CloudService.upload_qr_code(user_id, qr_image)
+            uploaded_public_ids.append(public_id)
+            qr_task = asyncio.create_task(self._upload_qr(user_id, transformed_url))
             transformed_picture = TransformedPicture(
-                original_picture_id=original_picture_id,
+                original_picture_id=original_picture.id,
                 url=transformed_url,
                 public_id=public_id,
-                qr_url=qr_url,
-                qr_public_id=qr_public_id,
                 user_id=user_id,
             )
             self.session.add(transformed_picture)
+            flushed, qr = await asyncio.gather(self.session.flush(), qr_task, return_exceptions=True)
+            if not isinstance(qr, BaseException):
+                uploaded_public_ids.append(qr[1])
+            for result in (flushed, qr):
+                if isinstance(result, BaseException):
+                    raise result
+            transformed_picture.qr_url, transformed_picture.qr_public_id = qr
             await self.session.commit()
-            await self.session.refresh(transformed_picture)
             return transformed_picture
         except Exception:
+            logger.exception("Failed to create a transformed picture of picture %s", original_picture.id)
+            await self.session.rollback()
+            # Nothing refers to the uploaded assets any more.
+            await asyncio.gather(
+                *(CloudService.delete_picture(uploaded) for uploaded in uploaded_public_ids), return_exceptions=True)
             return None
 
     async def update_transformed_picture(
-            self, transformed_picture_id: int,
+            self, transformed_picture: TransformedPicture,
             transformation_params: dict,
     ):
         """
         Updates an existing transformed picture entry in the database.
 
-        :param transformed_picture_id: ID of the transformed picture to be updated.
-        :type transformed_picture_id: int
+        :param transformed_picture: The already loaded transformed picture to be updated.
+        :type transformed_picture: TransformedPicture
         :param transformation_params: Dictionary containing transformation parameters.
         :type transformation_params: dict
         :return: The updated TransformedPicture object or None if an exception occurs.
         :rtype: TransformedPicture or None
         """
-        transformed_picture = await self.get_transformed_picture(transformed_picture_id)
         user_id = transformed_picture.user_id
-        if not transformed_picture:
-            return None
         try:
             new_transformed_url = await CloudService.update_picture_on_cloudinary(
                 public_id=transformed_picture.public_id,
@@ -83,14 +128,13 @@ class TransformRepository:
             )
             if not new_transformed_url:
                 return None
-            new_qr_image = qrcode.make(new_transformed_url)
-            new_qr_url, new_qr_public_id = await CloudService.upload_qr_code(user_id, new_qr_image)
-            transformed_picture.url = new_transformed_url
-            transformed_picture.qr_url = new_qr_url
-            transformed_picture.qr_public_id = new_qr_public_id
+            if new_transformed_url != transformed_picture.url or not transformed_picture.qr_url:
+                new_qr_url, new_qr_public_id = await self._upload_qr(user_id, new_transformed_url)
+                transformed_picture.url = new_transformed_url
+                transformed_picture.qr_url = new_qr_url
+                transformed_picture.qr_public_id = new_qr_public_id
             self.session.add(transformed_picture)
             await self.session.commit()
-            await self.session.refresh(transformed_picture)
             return transformed_picture
         except Exception:
             return None
@@ -104,9 +148,7 @@ class TransformRepository:
         :return: The retrieved Picture object or None if not found.
         :rtype: Picture or None
         """
-        query = select(Picture).where(Picture.id == picture_id)
-        result = await self.session.execute(query)
-        return result.unique().scalar_one_or_none()
+        return await self.session.get(Picture, picture_id, options=[raiseload(Picture.user)])
 
     async def get_transformed_picture(self, transformed_picture_id: int):
         """
@@ -117,22 +159,25 @@ class TransformRepository:
         :return: The retrieved TransformedPicture object or None if not found.
         :rtype: TransformedPicture or None
         """
-        query = select(TransformedPicture).where(TransformedPicture.id == transformed_picture_id)
-        result = await self.session.execute(query)
-        return result.scalars().first()
+        return await self.session.get(TransformedPicture, transformed_picture_id)
 
-    async def get_user_transforms(self, user_id: int):
+    async def get_user_transforms(self, user_id: int, limit: int = 50, offset: int = 0):
         """
-        Retrieves a list of transformed pictures associated with a specific user.
+        Retrieves a page of transformed pictures associated with a specific user.
 
         :param user_id: User ID for which transformed pictures are to be retrieved.
         :type user_id: int
+        :param limit: Maximum number of transformed pictures to return.
+        :type limit: int
+        :param offset: Number of transformed pictures to skip.
+        :type offset: int
         :return: List of TransformedPicture objects associated with the user.
         :rtype: list[TransformedPicture]
         """
-        query = select(TransformedPicture).where(TransformedPicture.user_id == user_id)
+        query = select(TransformedPicture).where(TransformedPicture.user_id == user_id).order_by(
+            TransformedPicture.id).limit(limit).offset(offset)
         result = await self.session.execute(query)
-        return result.scalars().unique().all()
+        return result.scalars().all()
 
     async def delete_transformed_picture(self, transformed_picture_id: int):
         """
@@ -142,21 +187,25 @@ class TransformRepository:
         :type transformed_picture_id: int
         :return: True if the deletion is successful, False otherwise.
         :rtype: bool
-        :raises HTTPException: If there is an issue with cloud service operations or a server error occurs.
+        :raises HTTPException: If a server error occurs while deleting the database row.
         """
-        query = select(TransformedPicture).where(TransformedPicture.id == transformed_picture_id)
-        result = await self.session.execute(query)
-        transformed_picture = result.scalars().first()
-        if transformed_picture:
-            try:
-                await CloudService.delete_picture(transformed_picture.public_id)
-                await CloudService.delete_picture(transformed_picture.qr_public_id)
-                await self.session.delete(transformed_picture)
-                await self.session.commit()
-            except HTTPException as http_exc:
-                raise HTTPException(status_code=http_exc.status_code, detail=http_exc.detail)
-            except Exception as e:
-                await self.session.rollback()
-                raise HTTPException(status_code=500, detail=f"Внутрішня помилка сервера: {e}")
-            return True
-        return False
+        query = delete(TransformedPicture).where(TransformedPicture.id == transformed_picture_id).returning(
+            TransformedPicture.public_id, TransformedPicture.qr_public_id)
+        try:
+            result = await self.session.execute(query)
+            deleted = result.one_or_none()
+            if deleted is None:
+                return False
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            raise HTTPException(status_code=500, detail=f"Внутрішня помилка сервера: {e}")
+
+        results = await asyncio.gather(
+            *(CloudService.delete_picture(public_id) for public_id in deleted if public_id),
+            return_exceptions=True,
+        )
+        for error in results:
+            if isinstance(error, BaseException):
+                logger.error("Failed to delete a transformed picture from Cloudinary: %s", error)
+        return True
@@ -1,12 +1,45 @@
+import hashlib
+from datetime import datetime
+
+import orjson
 from fastapi import Depends
-from libgravatar import Gravatar
-from sqlalchemy import select
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from src.database.db import get_db
-from src.entity.models import User, Picture, Role
+from src.entity.models import User, UserAuth, Picture, Role
 from src.schemas.users import UserSchema, UserUpdate
 from src.services import auth
+from src.services.cache import cache_get, cache_set, cache_delete
+
+USER_CACHE_TTL = 60
+_CACHED_USER_FIELDS = (
+    'id', 'full_name', 'email', 'avatar', 'role', 'ban', 'token_version', 'picture_count', 'created_at', 'updated_at')
+
+_users_exist = False
+
+# Statements run on every pooled connection at startup, shaped like the lookups done on each request.
+WARM_UP_STATEMENTS = (
+    select(User).where(func.lower(User.email) == '').limit(1),
+    select(User).filter_by(full_name='').limit(1),
+)
+
+
+def gravatar_url(email: str) -> str:
+    """
+    Build the Gravatar URL for an email without any network call.
+
+    Gravatar itself serves an identicon when the address has no avatar.
+
+    :param email: Email of the user.
+    :type email: str
+    :return: URL of the user's Gravatar image.
+    :rtype: str
+    """
+    email_hash = hashlib.md5(email.strip().lower().encode()).hexdigest()
+    return f"https://www.gravatar.com/avatar/{email_hash}?s=200&d=identicon"
 
 
 async def get_user_by_email(email: str, db: AsyncSession = Depends(get_db)):
@@ -20,12 +53,75 @@ async def get_user_by_email(email: str, db: AsyncSession = Depends(get_db)):
     :return: The retrieved user or None if not found.
     :rtype: User or None
     """
-    stmt = select(User).where(User.email == email)
-    user = await db.execute(stmt)
-    user = user.unique().scalar_one_or_none()
+    stmt = select(User).where(func.lower(User.email) == email.lower()).limit(1)
+    return await db.scalar(stmt)
+
+
+def _user_to_dict(user: User) -> dict:
+    """
+    Convert a user to a plain dictionary that can be cached, leaving out the password hash.
+
+    :param user: The user to be converted.
+    :type user: User
+    :return: The user fields.
+    :rtype: dict
+    """
+    fields = {name: getattr(user, name) for name in _CACHED_USER_FIELDS}
+    fields['role'] = user.role.name if user.role else None
+    return fields
+
+
+def _user_from_dict(fields: dict) -> User:
+    """
+    Rebuild a detached user from its cached fields.
+
+    :param fields: The cached user fields.
+    :type fields: dict
+    :return: A detached user with the cached fields loaded.
+    :rtype: User
+    """
+    fields['role'] = Role[fields['role']] if fields['role'] else None
+    for name in ('created_at', 'updated_at'):
+        if fields[name]:
+            fields[name] = datetime.fromisoformat(fields[name])
+    user = User(**fields)
+    make_transient_to_detached(user)
     return user
 
 
+async def get_cached_user_by_email(email: str, db: AsyncSession):
+    """
+    Retrieve a user by email, reading it from the cache when possible.
+
+    The cached user is attached to the session without a query, so it can be modified and committed as usual.
+
+    :param email: Email of the user to be retrieved.
+    :type email: str
+    :param db: Asynchronous SQLAlchemy session.
+    :type db: AsyncSession
+    :return: The retrieved user or None if not found.
+    :rtype: User or None
+    """
+    cached = await cache_get(f'user:{email}')
+    if cached is not None:
+        return await db.merge(_user_from_dict(orjson.loads(cached)), load=False)
+
+    user = await get_user_by_email(email, db)
+    if user is not None:
+        await cache_set(f'user:{email}', orjson.dumps(_user_to_dict(user)), USER_CACHE_TTL)
+    return user
+
+
+async def invalidate_user(email: str):
+    """
+    Remove a user from the cache after it has been changed.
+
+    :param email: Email of the changed user.
+    :type email: str
+    """
+    await cache_delete(f'user:{email}')
+
+
 async def create_user(body: UserSchema, db: AsyncSession = Depends(get_db)):
     """
     Create a new user in the database.
@@ -34,26 +130,18 @@ async def create_user(body: UserSchema, db: AsyncSession = Depends(get_db)):
     :type body: UserSchema
     :param db: Asynchronous SQLAlchemy session (dependency injection).
     :type db: AsyncSession
-    :return: The created user.
-    :rtype: User
+    :return: The created user or None if the full name or email is already taken.
+    :rtype: User or None
     """
-    avatar = None
-    try:
-        g = Gravatar(body.email)
-        avatar = g.get_image()
-    except Exception as err:
-        print(err)
-
+    avatar = gravatar_url(body.email)
     is_first_user = await check_is_first_user(db)
-    if is_first_user:
-        new_user = User(**body.model_dump(),
-                        avatar=avatar, role=Role.admin)
-    else:
-        new_user = User(**body.model_dump(), avatar=avatar)
-
-    db.add(new_user)
+    role = Role.admin if is_first_user else Role.user
+    stmt = insert(User).values(**body.model_dump(), avatar=avatar, role=role).on_conflict_do_nothing().returning(User)
+    new_user = await db.execute(stmt)
+    new_user = new_user.scalar_one_or_none()
+    if new_user is None:
+        return None
     await db.commit()
-    await db.refresh(new_user)
     return new_user
 
 
@@ -61,31 +149,73 @@ async def check_is_first_user(db: AsyncSession):
     """
     Check if the database has any users.
 
+    Users are never deleted, so once one exists the answer is remembered and no further query is issued.
+
     :param db: Asynchronous SQLAlchemy session (dependency injection).
     :type db: AsyncSession
     :return: True if the database has no users, False otherwise.
     :rtype: bool
     """
-    stmt = select(User).limit(1)
-    result = await db.execute(stmt)
-    return result.unique().scalar_one_or_none() is None
+    global _users_exist
+    if not _users_exist:
+        _users_exist = await db.scalar(select(exists().select_from(User)))
+    return not _users_exist
 
 
 async def update_token(user: User, token: str | None, db: AsyncSession):
     """
     Update the refresh token for a user in the database.
 
-    :param user: User instance to update.
-    :type user: User
+    :param user: User instance or auth row (anything with an ``id``) to update.
+    :type user: User | Row
     :param token: New refresh token or None to clear the token.
     :type token: str or None
     :param db: Asynchronous SQLAlchemy session (dependency injection).
     :type db: AsyncSession
     """
-    user.refresh_token = token
+    stmt = insert(UserAuth).values(user_id=user.id, refresh_token=token).on_conflict_do_update(
+        index_elements=[UserAuth.user_id], set_={'refresh_token': token})
+    await db.execute(stmt)
     await db.commit()
 
 
+async def get_refresh_auth(email: str, db: AsyncSession):
+    """
+    Retrieve the columns needed to refresh a user's tokens together with their stored refresh token
+    in a single query, without loading the full user.
+
+    :param email: Email of the user to be retrieved.
+    :type email: str
+    :param db: Asynchronous SQLAlchemy session (dependency injection).
+    :type db: AsyncSession
+    :return: A row with ``id``, ``token_version`` and ``refresh_token`` (None if there is none),
+        or None if the user is not found.
+    :rtype: Row or None
+    """
+    stmt = (
+        select(User.id, User.token_version, UserAuth.refresh_token)
+        .outerjoin(UserAuth)
+        .where(func.lower(User.email) == email.lower())
+        .limit(1)
+    )
+    row = await db.execute(stmt)
+    return row.first()
+
+
+async def revoke_tokens(user: User, db: AsyncSession):
+    """
+    Revoke every token issued to a user by bumping their token version and clearing the refresh token.
+
+    :param user: User instance whose tokens are revoked.
+    :type user: User
+    :param db: Asynchronous SQLAlchemy session (dependency injection).
+    :type db: AsyncSession
+    """
+    user.token_version += 1
+    await update_token(user, None, db)
+    await invalidate_user(user.email)
+
+
 async def update_avatar(full_name, url: str, db: AsyncSession, public_id) -> User:
     """
     Update the avatar for a user and add a new picture entry to the database.
@@ -105,10 +235,8 @@ async def update_avatar(full_name, url: str, db: AsyncSession, public_id) -> Use
     user.avatar = url
     picture = Picture(url=url, cloudinary_public_id=public_id, description=None, user_id=user.id)
     db.add(picture)
-    db.add(user)
     await db.commit()
-    await db.refresh(picture)
-    await db.refresh(user)
+    await invalidate_user(user.email)
     return user
 
 
@@ -123,10 +251,30 @@ async def get_user_by_username(full_name: str, db: AsyncSession = Depends(get_db
     :return: The retrieved user or None if not found.
     :rtype: User or None
     """
-    stmt = select(User).filter_by(full_name=full_name)
-    user = await db.execute(stmt)
-    user = user.unique().scalar_one_or_none()
-    return user
+    stmt = select(User).filter_by(full_name=full_name).limit(1)
+    return await db.scalar(stmt)
+
+
+async def get_login_auth(full_name: str, db: AsyncSession):
+    """
+    Retrieve the columns needed to log in a user that is not banned, based on the full name,
+    without loading the full user.
+
+    :param full_name: Full name of the user to be retrieved.
+    :type full_name: str
+    :param db: Asynchronous SQLAlchemy session (dependency injection).
+    :type db: AsyncSession
+    :return: A row with ``id``, ``email``, ``password`` and ``token_version``, or None if the user
+        is not found or banned.
+    :rtype: Row or None
+    """
+    stmt = (
+        select(User.id, User.email, User.password, User.token_version)
+        .where(User.full_name == full_name, User.ban.is_not(True))
+        .limit(1)
+    )
+    row = await db.execute(stmt)
+    return row.first()
 
 
 async def update_user(email: str, user_update: UserUpdate, db: AsyncSession):
@@ -142,22 +290,35 @@ async def update_user(email: str, user_update: UserUpdate, db: AsyncSession):
     :return: The updated user instance or None if the user does not exist.
     :rtype: User or None
     """
-    stmt = select(User).filter_by(email=email)
+    values = user_update.model_dump()
+    values['password'] = await auth.auth_service.get_password_hash(values['password'])
+    stmt = update(User).where(User.email == email).values(**values).returning(User)
     user = await db.execute(stmt)
-    user = user.unique().scalar_one_or_none()
-
+    user = user.scalar_one_or_none()
+    await db.commit()
     if user:
-        for field, value in user_update.__dict__.items():
-            if field == 'password':
-                setattr(user, field, auth.auth_service.get_password_hash(value))
-            else:
-                setattr(user, field, value)
+        await invalidate_user(email)
+    return user
 
-        await db.commit()
-        await db.refresh(user)
-        return user
-    else:
-        return None
+
+async def get_picture_counts(db: AsyncSession, user_ids: list[int]) -> dict[int, int]:
+    """
+    Count the pictures of several users with a single grouped query.
+
+    :param db: Asynchronous SQLAlchemy session (dependency injection).
+    :type db: AsyncSession
+    :param user_ids: IDs of the users whose pictures are counted.
+    :type user_ids: list[int]
+    :return: Picture count by user ID; users without pictures are left out.
+    :rtype: dict[int, int]
+    """
+    stmt = (
+        select(Picture.user_id, func.count(Picture.id))
+        .where(Picture.user_id.in_(user_ids))
+        .group_by(Picture.user_id)
+    )
+    counts = await db.execute(stmt)
+    return dict(counts.all())
 
 
 async def get_picture_count(db: AsyncSession, user: User):
@@ -169,16 +330,11 @@ async def get_picture_count(db: AsyncSession, user: User):
     :param user: User instance for which the picture count is to be retrieved.
     :type user: User
     """
-    stmt = select(Picture).filter_by(user=user)
-    pictures = await db.execute(stmt)
-
-    if pictures is None:
-        picture_count = 1
-    else:
-        picture_count = len(pictures.unique().all())
-    user.picture_count = picture_count
-    await db.commit()
-    await db.refresh(user)
+    picture_count = (await get_picture_counts(db, [user.id])).get(user.id, 0)
+    if user.picture_count != picture_count:
+        user.picture_count = picture_count
+        await db.commit()
+        await invalidate_user(user.email)
 
 
 async def ban_user(username: str, db: AsyncSession):
@@ -192,12 +348,12 @@ async def ban_user(username: str, db: AsyncSession):
     :return: True if the user is successfully banned, False otherwise.
     :rtype: bool
     """
-    stmt = select(User).filter_by(full_name=username)
-    user = await db.execute(stmt)
-    user = user.unique().scalar_one_or_none()
+    stmt = select(User).filter_by(full_name=username).limit(1)
+    user = await db.scalar(stmt)
     if user:
         user.ban = True
         await db.commit()
+        await invalidate_user(user.email)
         return True
     else:
         return False
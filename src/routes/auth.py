@@ -25,12 +25,10 @@ async def signup(body: UserSchema, db: AsyncSession = Depends(get_db)):
     :rtype: UserResponse
     :raises HTTPException: If an account with the provided email already exists.
     """
-    # exist_user = await repositories_users.get_user_by_email(body.email, db)
-    exist_user = await repositories_users.get_user_by_username(body.full_name, db)
-    if exist_user:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Account already exists")
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash(body.password)
     new_user = await repositories_users.create_user(body, db)
+    if new_user is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Account already exists")
 
     return new_user
 
@@ -46,21 +44,17 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession =
     :type db: AsyncSession
     :return: Access token and refresh token.
     :rtype: TokenSchema
-    :raises HTTPException: If the provided email is invalid or the password is incorrect.
+    :raises HTTPException: If the user is unknown or banned, or the password is incorrect.
     """
-    # user = await repositories_users.get_user_by_email(body.username, db)
-    user = await repositories_users.get_user_by_username(body.username, db)
+    user = await repositories_users.get_login_auth(body.username, db)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email")
 
-    if not auth_service.verify_password(body.password, user.password):
+    if not await auth_service.verify_password(body.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password")
-    if user.ban:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="You were banned by an administrator")
     # Generate JWT
-    access_token = await auth_service.create_access_token(data={"sub": user.email})
-    refresh = await auth_service.create_refresh_token(data={"sub": user.email})
+    access_token = await auth_service.create_access_token(data={"sub": user.email, "ver": user.token_version})
+    refresh = await auth_service.create_refresh_token(data={"sub": user.email, "ver": user.token_version})
     await repositories_users.update_token(user, refresh, db)
     return {"access_token": access_token, "refresh_token": refresh, "token_type": "bearer", }
 
@@ -73,6 +67,8 @@ async def refresh_token(
     """
     Endpoint to refresh an access token using a refresh token.
 
+    A token that is not the stored one is treated as reuse, and every token of the user is revoked.
+
     :param credentials: HTTPAuthorizationCredentials instance containing the refresh token.
     :type credentials: HTTPAuthorizationCredentials
     :param db: Asynchronous SQLAlchemy session (dependency injection).
@@ -82,14 +78,17 @@ async def refresh_token(
     :raises HTTPException: If the provided refresh token is invalid.
     """
     token = credentials.credentials
-    email = await auth_service.decode_refresh_token(token)
-    user = await repositories_users.get_user_by_email(email, db)
+    payload = await auth_service.decode_refresh_token(token)
+    email = payload["sub"]
+    user = await repositories_users.get_refresh_auth(email, db)
+    if user is None or payload.get("ver", 0) != user.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
     if user.refresh_token != token:
-        await repositories_users.update_token(user, None, db)
+        await repositories_users.revoke_tokens(await repositories_users.get_user_by_email(email, db), db)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
-    access_token = await auth_service.create_access_token(data={"sub": email})
-    refresh = await auth_service.create_refresh_token(data={"sub": email})
+    access_token = await auth_service.create_access_token(data={"sub": email, "ver": user.token_version})
+    refresh = await auth_service.create_refresh_token(data={"sub": email, "ver": user.token_version})
     await repositories_users.update_token(user, refresh, db)
     return {"access_token": access_token, "refresh_token": refresh, "token_type": "bearer", }
 
@@ -97,7 +96,7 @@ async def refresh_token(
 @router.post("/logout")
 async def logout(user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
     """
-    Endpoint to log out a user by adding their refresh token to the blacklist.
+    Endpoint to log out a user by revoking all of their issued tokens.
 
     :param user: The current authenticated user (dependency injection).
     :type user: User
@@ -106,6 +105,6 @@ async def logout(user: User = Depends(auth_service.get_current_user), db: AsyncS
     :return: A message indicating successful logout.
     :rtype: dict
     """
-    await auth_service.add_token_to_blacklist(user.id, user.refresh_token, db)
+    await repositories_users.revoke_tokens(user, db)
 
     return {"message": "Logout successful."}
@@ -1,17 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query, Path
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Path, Body, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.entity.models import User, Role
 from src.repository import comments as repo_comm
-from src.schemas.comment import CommentSchema, CommentResponse
+from src.schemas.comment import CommentSchema, CommentResponse, CommentListItem
 from src.services.auth import auth_service
+from src.services.etag import etag_response
 from src.services.roles import RoleAccess
 
 router = APIRouter(prefix='/comments', tags=['comments'])
 delete_access = RoleAccess([Role.admin, Role.moderator])
 
+BULK_COMMENTS_LIMIT = 100
+
 
 @router.post('/{picture_id}', response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
 async def create_comment(
@@ -44,39 +48,75 @@ async def create_comment(
     return comment
 
 
-@router.get('/all/{picture_id}', response_model=list[CommentResponse])
+@router.post('/bulk/{picture_id}', response_model=list[CommentResponse], status_code=status.HTTP_201_CREATED)
+async def create_comments(
+        bodies: list[CommentSchema] = Body(min_length=1, max_length=BULK_COMMENTS_LIMIT),
+        picture_id: int = Path(ge=1),
+        db: AsyncSession = Depends(get_db),
+        user: User = Depends(auth_service.get_current_user),
+):
+    """
+    Endpoint to create several comments on a picture in one request.
+
+    :param bodies: CommentSchema instances containing comments data.
+    :type bodies: list[CommentSchema]
+    :param picture_id: ID of the picture to which the comments are associated.
+    :type picture_id: int
+    :param db: Asynchronous SQLAlchemy session (dependency injection).
+    :type db: AsyncSession
+    :param user: Current authenticated user (dependency injection).
+    :type user: User
+    :return: The created comments.
+    :rtype: list[CommentResponse]
+    :raises HTTPException: If the picture does not exist or the request is malformed.
+    """
+    try:
+        comments = await repo_comm.create_comments(bodies, picture_id, db, user)
+    except IntegrityError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='BAD REQUEST')
+    return comments
+
+
+@router.get('/all/{picture_id}', response_model=list[CommentListItem])
 async def get_comments(
         picture_id: int = Path(ge=1),
         offset: int = Query(0, ge=0),
         limit: int = Query(10, ge=10, le=100),
+        after_id: int | None = Query(None, ge=1),
         db: AsyncSession = Depends(get_db),
         user: User = Depends(auth_service.get_current_user),
 ):
     """
     Endpoint to retrieve a list of comments for a specific picture.
 
+    Pass the ID of the last received comment as ``after_id`` to get the next page;
+    it takes precedence over ``offset`` and stays fast however deep the page is.
+
+    The rows already have the shape of ``CommentListItem``, so they are serialized directly
+    with orjson instead of being validated against the response model again.
+
     :param picture_id: ID of the picture for which comments are to be retrieved.
     :type picture_id: int
     :param offset: Offset for pagination.
     :type offset: int
     :param limit: Limit for pagination.
     :type limit: int
+    :param after_id: ID of the last comment of the previous page.
+    :type after_id: int | None
     :param db: Asynchronous SQLAlchemy session (dependency injection).
     :type db: AsyncSession
     :param user: Current authenticated user (dependency injection).
     :type user: User
     :return: List of comments.
-    :rtype: list[CommentResponse]
-    :raises HTTPException: If the picture is not found.
+    :rtype: list[CommentListItem]
     """
-    comments = await repo_comm.get_comments(picture_id, offset, limit, db)
-    if comments is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Picture not found")
-    return comments
+    comments = await repo_comm.get_comments(picture_id, offset, limit, db, after_id)
+    return ORJSONResponse(comments)
 
 
 @router.get('/{comment_id}', response_model=CommentResponse)
 async def get_comment(
+        request: Request,
         comment_id: int = Path(ge=1),
         db: AsyncSession = Depends(get_db),
         user: User = Depends(auth_service.get_current_user),
@@ -84,6 +124,10 @@ async def get_comment(
     """
     Endpoint to retrieve a specific comment by its ID.
 
+    The response carries an ETag, and a request whose If-None-Match matches it gets an empty 304.
+
+    :param request: FastAPI Request object.
+    :type request: Request
     :param comment_id: ID of the comment to be retrieved.
     :type comment_id: int
     :param db: Asynchronous SQLAlchemy session (dependency injection).
@@ -97,7 +141,8 @@ async def get_comment(
     comment = await repo_comm.get_comment(comment_id, db)
     if comment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Comment not found')
-    return comment
+    comment = CommentResponse.model_validate(comment, from_attributes=True)
+    return etag_response(request, comment.model_dump_json().encode())
 
 
 @router.patch('/{comment_id}', response_model=CommentResponse)
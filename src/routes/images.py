@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status, Path, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, status, Path, HTTPException, UploadFile, File, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
@@ -6,6 +6,7 @@ from src.entity.models import User
 from src.repository import images as repositories_images
 from src.schemas.images import PictureSchema, PictureResponseSchema, PictureUpdateSchema
 from src.services.auth import auth_service
+from src.services.etag import etag_response
 
 router = APIRouter(prefix='/images', tags=['images'])
 
@@ -20,6 +21,9 @@ async def upload_picture(
     """
     Endpoint to upload a new picture.
 
+    Uploading a file with the same content as one of the user's pictures is rejected with 409 Conflict,
+    and the detail names the ID of the existing picture; its description and tags are left unchanged.
+
     :param file: The image file to be uploaded.
     :type file: UploadFile
     :param body: PictureSchema instance containing picture data.
@@ -30,7 +34,7 @@ async def upload_picture(
     :type user: User
     :return: The uploaded picture.
     :rtype: PictureResponseSchema
-    :raises HTTPException: If there is an issue with the upload or authentication fails.
+    :raises HTTPException: If the picture is a duplicate, there is an issue with the upload or authentication fails.
     """
     picture = await repositories_images.upload_picture(file, body, db, user)
     if picture is None:
@@ -96,6 +100,7 @@ async def update_picture(
 
 @router.get("/{picture_id}", response_model=PictureResponseSchema)
 async def get_picture(
+        request: Request,
         picture_id: int = Path(ge=1),
         db: AsyncSession = Depends(get_db),
         user=Depends(auth_service.get_current_user),
@@ -103,6 +108,10 @@ async def get_picture(
     """
     Endpoint to retrieve a specific picture by its ID.
 
+    The response carries an ETag, and a request whose If-None-Match matches it gets an empty 304.
+
+    :param request: FastAPI Request object.
+    :type request: Request
     :param picture_id: ID of the picture to be retrieved.
     :type picture_id: int
     :param db: Asynchronous SQLAlchemy session (dependency injection).
@@ -117,4 +126,4 @@ async def get_picture(
     if picture is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="NOT FOUND")
-    return picture
+    return etag_response(request, PictureResponseSchema.model_validate(picture).model_dump_json().encode())
@@ -1,6 +1,7 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
@@ -10,6 +11,7 @@ from src.schemas.transform import TransformSchema, TransformResponse
 from src.services.auth import auth_service
 
 router = APIRouter(prefix='/transform', tags=['transform'])
+_transforms_adapter = TypeAdapter(List[TransformResponse])
 
 
 def access_checking(picture, current_user: User):
@@ -71,7 +73,7 @@ async def create_transform(
         raise HTTPException(status_code=400, detail="Необхідно вказати хоча б один параметр трансформації")
     transformed_picture = await transform_repo.create_transformed_picture(
         user_id=picture.user_id,
-        original_picture_id=original_picture_id,
+        original_picture=picture,
         transformation_params=transformation_params
     )
     if transformed_picture is None:
@@ -82,12 +84,20 @@ async def create_transform(
 
 @router.get("/user_transforms", response_model=List[TransformResponse], status_code=status.HTTP_200_OK)
 async def list_user_transforms(
+        offset: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=100),
         current_user: User = Depends(auth_service.get_current_user),
         session: AsyncSession = Depends(get_db),
 ):
     """
     Endpoint to list transformed pictures for the current user.
 
+    The whole list is validated and encoded to JSON by one prebuilt adapter.
+
+    :param offset: Offset for pagination.
+    :type offset: int
+    :param limit: Limit for pagination.
+    :type limit: int
     :param current_user: Current authenticated user (dependency injection).
     :type current_user: User
     :param session: Asynchronous SQLAlchemy session (dependency injection).
@@ -97,10 +107,11 @@ async def list_user_transforms(
     :raises HTTPException: If no transformed pictures are found.
     """
     transform_repo = TransformRepository(session)
-    user_transforms = await transform_repo.get_user_transforms(current_user.id)
+    user_transforms = await transform_repo.get_user_transforms(current_user.id, limit, offset)
     if user_transforms is None:
         raise HTTPException(status_code=404, detail="Зображення не знайдено")
-    return user_transforms
+    user_transforms = _transforms_adapter.validate_python(user_transforms, from_attributes=True)
+    return Response(content=_transforms_adapter.dump_json(user_transforms), media_type='application/json')
 
 
 @router.get("/{transform_id}", response_model=TransformResponse, status_code=status.HTTP_200_OK)
@@ -188,7 +199,7 @@ async def update_transform(
     transformed_picture = await transform_repo.get_transformed_picture(transform_id)
     access_checking(transformed_picture, current_user)
     new_transformed_picture = await transform_repo.update_transformed_picture(
-        transformed_picture_id=transform_id,
+        transformed_picture=transformed_picture,
         transformation_params=request.transformation_params)
     if not new_transformed_picture:
         raise HTTPException(status_code=404, detail="Трансформація не виконана")
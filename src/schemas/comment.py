@@ -15,3 +15,14 @@ class CommentResponse(CommentSchema):
     picture_id: int
     created_at: datetime
     updated_at: datetime
+
+
+class CommentListItem(BaseModel):
+    """Pydantic model for serializing comments in list responses."""
+    id: int
+    text: str
+    user_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 
 
 class PictureSchema(BaseModel):
@@ -18,9 +18,24 @@ class PictureUpdateSchema(BaseModel):
 class PictureResponseSchema(BaseModel):
     """Pydantic model for serializing picture data in responses."""
     user_id: int
-    picture_id: int
+    picture_id: int = Field(validation_alias=AliasChoices('picture_id', 'id'))
     url: str
     description: Optional[str] = None
     tags: Optional[List[str]] = []
     created_at: datetime
-    comments: Optional[list[str]] = []
+    comments: Optional[list[str]] = Field(default=[], validation_alias=AliasChoices('comments', 'comment'))
+
+    @field_validator('tags', mode='before')
+    @classmethod
+    def tag_names(cls, value):
+        """Accept Tag objects as well as tag names."""
+        return [getattr(tag, 'name', tag) for tag in value or []]
+
+    @field_validator('comments', mode='before')
+    @classmethod
+    def comment_texts(cls, value):
+        """Accept Comment objects as well as comment texts."""
+        return [getattr(comment, 'text', comment) for comment in value or []]
+
+    class Config:
+        from_attributes = True
@@ -1,15 +1,30 @@
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import AfterValidator, BaseModel, EmailStr, Field
 
 from src.entity.models import Role
 
 
+def canonical_email(value: str) -> str:
+    """
+    Lowercase an email, so one address cannot be registered twice in different case.
+
+    :param value: The validated email.
+    :type value: str
+    :return: The email in lowercase.
+    :rtype: str
+    """
+    return value.strip().lower()
+
+
+CanonicalEmail = Annotated[EmailStr, AfterValidator(canonical_email)]
+
+
 class UserSchema(BaseModel):
     """Pydantic model for validating incoming user registration data."""
     full_name: str = Field(min_length=2, max_length=50)
-    email: EmailStr
+    email: CanonicalEmail
     password: str = Field(min_length=4, max_length=20)
 
 
@@ -30,7 +45,7 @@ class UserResponse(BaseModel):
 class UserUpdate(BaseModel):
     """Pydantic model for validating incoming user update data."""
     full_name: str
-    email: EmailStr
+    email: CanonicalEmail
     password: str
 
 
@@ -1,3 +1,4 @@
 from .auth import *
+from .cache import *
 from .cloudstore import *
 from .roles import *
@@ -0,0 +1,107 @@
+import logging
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from src.conf.config import config
+
+logger = logging.getLogger(__name__)
+
+redis_client = redis.Redis(
+    host=config.REDIS_HOST,
+    port=config.REDIS_PORT,
+    password=config.REDIS_PASSWORD,
+    db=0,
+)
+
+
+async def cache_get(key: str):
+    """
+    Get a cached value, treating an unavailable Redis as a cache miss.
+
+    :param key: Cache key.
+    :type key: str
+    :return: The cached value or None on a miss.
+    :rtype: bytes | None
+    """
+    try:
+        return await redis_client.get(key)
+    except RedisError:
+        logger.warning("Redis is unavailable, reading %s from the database", key)
+        return None
+
+
+async def cache_set(key: str, value: bytes, ttl: int):
+    """
+    Store a value in the cache for ``ttl`` seconds, ignoring Redis failures.
+
+    :param key: Cache key.
+    :type key: str
+    :param value: Serialized value to be cached.
+    :type value: bytes
+    :param ttl: Time to live in seconds.
+    :type ttl: int
+    """
+    try:
+        await redis_client.set(key, value, ex=ttl)
+    except RedisError:
+        logger.warning("Redis is unavailable, %s is not cached", key)
+
+
+async def cache_delete(*keys: str):
+    """
+    Remove keys from the cache, ignoring Redis failures.
+
+    :param keys: Cache keys to be removed.
+    :type keys: str
+    """
+    try:
+        await redis_client.delete(*keys)
+    except RedisError:
+        logger.warning("Redis is unavailable, %s is not invalidated", keys)
+
+
+async def cache_incr(key: str):
+    """
+    Increment a counter key, used to bump the version of a cached namespace.
+
+    :param key: Counter key.
+    :type key: str
+    """
+    try:
+        await redis_client.incr(key)
+    except RedisError:
+        logger.warning("Redis is unavailable, %s is not incremented", key)
+
+
+async def cache_hmget(key: str, fields: list[str]):
+    """
+    Get several fields of a cached hash, treating an unavailable Redis as a cache miss.
+
+    :param key: Hash key.
+    :type key: str
+    :param fields: Hash fields to be read.
+    :type fields: list[str]
+    :return: The cached values, None for every missing field.
+    :rtype: list[bytes | None]
+    """
+    try:
+        return await redis_client.hmget(key, fields)
+    except RedisError:
+        logger.warning("Redis is unavailable, reading %s from the database", key)
+        return [None] * len(fields)
+
+
+async def cache_hset(key: str, mapping: dict):
+    """
+    Store fields of a cached hash without expiry, ignoring Redis failures.
+
+    :param key: Hash key.
+    :type key: str
+    :param mapping: Fields and values to be stored.
+    :type mapping: dict
+    """
+    try:
+        await redis_client.hset(key, mapping=mapping)
+    except RedisError:
+        logger.warning("Redis is unavailable, %s is not cached", key)
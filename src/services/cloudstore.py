@@ -2,8 +2,8 @@ import asyncio
 from io import BytesIO
 
 import cloudinary
+import cloudinary.api
 import cloudinary.uploader
-from PIL import Image
 from cloudinary.exceptions import Error as CloudinaryError
 from fastapi import HTTPException, UploadFile
 from requests.exceptions import RequestException
@@ -16,6 +16,25 @@ cloudinary.config(
     api_secret=config.CLD_API_SECRET,
 )
 
+UPLOAD_CHUNK_SIZE = 6_000_000
+CLOUDINARY_CONCURRENCY = 8
+DELETE_BATCH_SIZE = 100
+
+_cloudinary_slots = asyncio.Semaphore(CLOUDINARY_CONCURRENCY)
+
+
+async def _call_cloudinary(func, *args, **kwargs):
+    """
+    Run a blocking Cloudinary SDK call in a worker thread, at most CLOUDINARY_CONCURRENCY at a time.
+
+    :param func: Cloudinary SDK function to be called.
+    :type func: Callable
+    :return: The result of the call.
+    :rtype: Any
+    """
+    async with _cloudinary_slots:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
 
 class CloudService:
     """Class for handling image and file uploads to Cloudinary."""
@@ -37,9 +56,10 @@ class CloudService:
         try:
             if not folder_name:
                 folder_name = f"PythonGram/user_{user_id}/original_images"
-            response = await asyncio.to_thread(
-                cloudinary.uploader.upload,
+            response = await _call_cloudinary(
+                cloudinary.uploader.upload_large,
                 image_file.file,
+                chunk_size=UPLOAD_CHUNK_SIZE,
                 folder=folder_name,  # type: ignore
             )
             return response['url'], response['public_id']
@@ -66,7 +86,7 @@ class CloudService:
         """
         try:
             folder_name = f"PythonGram/user_{user_id}/transformed_images"
-            response = await asyncio.to_thread(
+            response = await _call_cloudinary(
                 cloudinary.uploader.upload,
                 image_url,
                 transformation=transformation_params,
@@ -90,7 +110,7 @@ class CloudService:
         :raises HTTPException: If an error occurs while deleting the image.
         """
         try:
-            await asyncio.to_thread(
+            await _call_cloudinary(
                 cloudinary.uploader.destroy,
                 public_id
             )
@@ -98,24 +118,49 @@ class CloudService:
             raise HTTPException(status_code=500, detail=f"Помилка видалення зображення: {e}")
 
     @staticmethod
-    async def upload_qr_code(user_id: int, img: Image.Image):
+    async def delete_pictures(public_ids: list[str]):
+        """
+        Delete several images from Cloudinary with the Admin API, up to DELETE_BATCH_SIZE per call.
+
+        The Admin API has an hourly quota, so single images should be deleted with ``delete_picture``.
+
+        :param public_ids: Public IDs of the images to be deleted.
+        :type public_ids: list[str]
+        :raises HTTPException: If an error occurs while deleting the images or some of them were not deleted.
+        """
+        try:
+            responses = await asyncio.gather(*(
+                _call_cloudinary(cloudinary.api.delete_resources, public_ids[i:i + DELETE_BATCH_SIZE])
+                for i in range(0, len(public_ids), DELETE_BATCH_SIZE)
+            ))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Помилка видалення зображення: {e}")
+        failed = [
+            public_id
+            for response in responses
+            for public_id, result in response.get('deleted', {}).items()
+            if result not in ('deleted', 'not_found')
+        ]
+        if failed:
+            raise HTTPException(status_code=500, detail=f"Помилка видалення зображення: {failed}")
+
+    @staticmethod
+    async def upload_qr_code(user_id: int, png: bytes):
         """
         Upload a QR code image to Cloudinary.
 
         :param user_id: User ID associated with the QR code.
         :type user_id: int
-        :param img: PIL Image object representing the QR code.
-        :type img: Image.Image
+        :param png: PNG bytes of the QR code.
+        :type png: bytes
         :return: Tuple containing the URL and public ID of the uploaded QR code.
         :rtype: tuple
         """
         try:
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            buffer.seek(0)
+            buffer = BytesIO(png)
 
             folder_name = f"PythonGram/user_{user_id}/qr_codes"
-            response = await asyncio.to_thread(cloudinary.uploader.upload, buffer, folder=folder_name)  # type: ignore
+            response = await _call_cloudinary(cloudinary.uploader.upload, buffer, folder=folder_name)  # type: ignore
             return response['url'], response['public_id']
         except CloudinaryError as e:
             raise HTTPException(status_code=500, detail=f"Cloudinary error: {e}")
@@ -137,7 +182,7 @@ class CloudService:
         :rtype: str
         """
         try:
-            response = await asyncio.to_thread(
+            response = await _call_cloudinary(
                 cloudinary.uploader.explicit,
                 public_id,
                 type='upload',  # type: ignore
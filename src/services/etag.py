@@ -0,0 +1,23 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def etag_response(request: Request, body: bytes) -> Response:
+    """
+    Build a JSON response tagged with an ETag of its body, or an empty 304 if the client already has it.
+
+    :param request: FastAPI Request object.
+    :type request: Request
+    :param body: The serialized JSON body.
+    :type body: bytes
+    :return: The JSON response or a 304 Not Modified response.
+    :rtype: Response
+    """
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        client_etags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        if etag in client_etags or '*' in client_etags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    return Response(content=body, media_type='application/json', headers={'ETag': etag})
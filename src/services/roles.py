@@ -26,6 +26,5 @@ class RoleAccess:
         :type user: User
         :raises HTTPException: Raises a 403 Forbidden exception if the user does not have the required role.
         """
-        print(user.role, self.allowed_roles)
         if user.role not in self.allowed_roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="FORBIDDEN")
@@ -1,13 +1,14 @@
 import unittest
-from fastapi import UploadFile
+from io import BytesIO
+from fastapi import UploadFile, HTTPException
 from datetime import datetime
 from unittest.mock import AsyncMock, patch, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.conf.config import config
 import cloudinary
 from pathlib import Path
-from src.schemas.images import PictureResponseSchema
-from src.entity.models import Picture, User
+from src.schemas.images import PictureResponseSchema, PictureSchema
+from src.entity.models import Picture, User, Comment
 from src.repository.images import (
     upload_picture,
     delete_picture,
@@ -42,9 +43,13 @@ class Testimages(unittest.IsolatedAsyncioTestCase):
 
     async def test_get_image(self):
         mocked_image = MagicMock()
-        mocked_image.scalar_one_or_none.return_value = self.image
+        mocked_image.mappings.return_value.one_or_none.return_value = {
+            'user_id': 1, 'picture_id': self.image.id, 'url': self.image.url,
+            'description': self.image.description, 'tags': None,
+            'created_at': self.image.created_at, 'comments': None,
+        }
         self.session.execute.return_value = mocked_image
-        result = await get_picture(1, self.session, User())
+        result = await get_picture(1, self.session, User(id=1))
         self.assertIsNotNone(result, 'Picture object is None')
 
     
@@ -72,21 +77,78 @@ class Testimages(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.created_at, body.created_at)
         self.assertTrue(hasattr(result, "id"))
 
-    @patch("src.services.cloudstore.CloudService.delete_picture")
-    async def test_delete_image(self, mock_delete_picture):
+    @patch("src.services.cloudstore.CloudService.upload_picture")
+    async def test_create_image_duplicate(self, mock_upload_picture):
+        file = UploadFile(filename='logo.png', file=BytesIO(b'same content'))
+        self.session.scalar.return_value = 5
+
+        with self.assertRaises(HTTPException) as error:
+            await upload_picture(file, PictureSchema(description='new', tags='a, b'), self.session, User(id=1))
+
+        self.assertEqual(error.exception.status_code, 409)
+        self.assertIn('5', error.exception.detail)
+        mock_upload_picture.assert_not_called()
+
+    @patch("src.services.cloudstore.CloudService.delete_pictures")
+    async def test_delete_image(self, mock_delete_pictures):
         cloudinary.config(
             cloud_name=config.CLD_NAME,
             api_key=config.CLD_API_KEY,
             api_secret=config.CLD_API_SECRET,
         )
 
-        mocked_image = MagicMock()
-        mocked_image.scalar_one_or_none.return_value = self.image
-        self.session.execute.return_value = mocked_image
+        self.session.get.return_value = self.image
+        mocked_transforms = MagicMock()
+        mocked_transforms.all.return_value = [('transform_id', 'qr_id')]
+        self.session.execute.return_value = mocked_transforms
+
+        result = await delete_picture(picture_id=1, db=self.session, user=User())
+
+        self.assertEqual(result, 'Success')
+        mock_delete_pictures.assert_awaited_once_with([self.image.cloudinary_public_id, 'transform_id', 'qr_id'])
+
+    @patch("src.services.cloudstore.CloudService.delete_picture")
+    async def test_delete_image_keeps_asset_when_commit_fails(self, mock_delete_picture):
+        self.session.get.return_value = self.image
+        mocked_transforms = MagicMock()
+        mocked_transforms.all.return_value = []
+        self.session.execute.return_value = mocked_transforms
+        self.session.commit.side_effect = ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            await delete_picture(picture_id=1, db=self.session, user=User())
+
+        mock_delete_picture.assert_not_called()
+
+    @patch("src.repository.images.cache_delete", new_callable=AsyncMock)
+    @patch("src.repository.images.cache_incr", new_callable=AsyncMock)
+    @patch("src.services.cloudstore.CloudService.delete_picture")
+    async def test_delete_image_invalidates_comments(self, mock_delete_picture, mock_cache_incr, mock_cache_delete):
+        self.image.comment = [Comment(id=7, text='first'), Comment(id=8, text='second')]
+        self.session.get.return_value = self.image
+        mocked_transforms = MagicMock()
+        mocked_transforms.all.return_value = []
+        self.session.execute.return_value = mocked_transforms
+
+        await delete_picture(picture_id=1, db=self.session, user=User())
+
+        mock_cache_incr.assert_awaited_once_with('comments:1:version')
+        mock_cache_delete.assert_awaited_once_with('pic:1', 'comment:7', 'comment:8')
+
+    @patch("src.services.cloudstore.CloudService.delete_pictures")
+    @patch("src.services.cloudstore.CloudService.delete_picture")
+    async def test_delete_image_without_transforms(self, mock_delete_picture, mock_delete_pictures):
+        self.image.cloudinary_public_id = 'picture_id'
+        self.session.get.return_value = self.image
+        mocked_transforms = MagicMock()
+        mocked_transforms.all.return_value = []
+        self.session.execute.return_value = mocked_transforms
 
         result = await delete_picture(picture_id=1, db=self.session, user=User())
 
         self.assertEqual(result, 'Success')
+        mock_delete_picture.assert_awaited_once_with('picture_id')
+        mock_delete_pictures.assert_not_awaited()
 
 
     @patch("src.services.cloudstore.CloudService.delete_picture")
@@ -97,9 +159,7 @@ class Testimages(unittest.IsolatedAsyncioTestCase):
             api_secret=config.CLD_API_SECRET,
         )
 
-        mocked_image = MagicMock()
-        mocked_image.scalar_one_or_none.return_value = None
-        self.session.execute.return_value = mocked_image
+        self.session.get.return_value = None
 
         user = User(id=1, full_name="test_user", password="qwerty", email="test@example.com")
         result = await delete_picture(picture_id=16, db=self.session, user=user)